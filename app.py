@@ -10,12 +10,6 @@ from config.settings import (
     TAVILY_API_KEY,
 )
 from components.sidebar import render_sidebar
-from components.results_table import (
-    render_data_table,
-    render_hierarchy,
-    render_statistics,
-)
-from components.export_controls import render_export_controls
 
 st.set_page_config(
     layout=APP_LAYOUT,
@@ -23,8 +17,9 @@ st.set_page_config(
     page_icon=APP_ICON,
 )
 
-st.markdown(
-    """
+# Streamlit drops elements that are not re-emitted on a rerun, so the style
+# block must be written every run; keep it a constant so nothing is rebuilt.
+_APP_CSS = """
 <style>
     .stApp { max-width: 1400px; margin: 0 auto; }
     .metric-card {
@@ -34,9 +29,9 @@ st.markdown(
         text-align: center;
     }
 </style>
-""",
-    unsafe_allow_html=True,
-)
+"""
+
+st.markdown(_APP_CSS, unsafe_allow_html=True)
 
 st.title(f"{APP_ICON} {APP_TITLE}")
 st.markdown(
@@ -100,6 +95,19 @@ def _run_generation(inputs) -> None:
     """Execute the research and AI generation pipeline."""
     from services.research_service import perform_research
     from services.ai_service import generate_topic_map
+    from services.result_cache import load_cached_result, save_cached_result
+
+    # Reuse a stored result for identical inputs instead of calling the APIs
+    cached = None if inputs.regenerate else load_cached_result(inputs)
+    if cached is not None:
+        research, entries = cached
+        st.session_state.research_data = research
+        _store_results(inputs, entries)
+        st.success(
+            f"Loaded a previously generated topic map with {len(entries)} topics "
+            "for these inputs."
+        )
+        return
 
     # Phase 2: Research
     with st.status("Researching topic...", expanded=True) as status:
@@ -130,9 +138,10 @@ def _run_generation(inputs) -> None:
                 competitors=", ".join(inputs.competitors) if inputs.competitors else "",
                 existing_content=inputs.existing_content or "",
                 compiled_research=research["compiled_text"],
+                use_cache=not inputs.regenerate,
             )
-            st.session_state.topic_map_entries = entries
-            st.session_state.topic_map_topic = inputs.topic
+            _store_results(inputs, entries)
+            save_cached_result(inputs, research, entries)
             status.update(label="Topic map generated!", state="complete")
         except Exception as e:
             status.update(label="Generation failed", state="error")
@@ -145,8 +154,27 @@ def _run_generation(inputs) -> None:
     )
 
 
+def _store_results(inputs, entries) -> None:
+    """Store generated entries and reset state derived from the previous map."""
+    from components.results_table import store_table_data
+    from models.topic_map import entries_fingerprint
+
+    st.session_state.topic_map_entries = entries
+    st.session_state.entries_fp = entries_fingerprint(entries)
+    st.session_state.topic_map_topic = inputs.topic
+    store_table_data(entries)
+    st.session_state.pop("hierarchy_html", None)
+
+
 def _display_results(inputs) -> None:
     """Display the stored topic map results."""
+    from components.results_table import (
+        render_data_table,
+        render_hierarchy,
+        render_statistics,
+    )
+    from components.export_controls import render_export_controls
+
     entries = st.session_state.topic_map_entries
     topic = st.session_state.get("topic_map_topic", inputs.topic)
 
@@ -2,11 +2,7 @@ from typing import List, Optional
 
 import streamlit as st
 
-from services.csv_service import (
-    generate_csv_bytes,
-    generate_filename,
-    topic_map_to_dataframe,
-)
+from services.csv_service import entries_to_csv_bytes, generate_filename
 
 
 def render_export_controls(
@@ -16,8 +12,7 @@ def render_export_controls(
     gdrive_folder: Optional[str] = None,
 ) -> None:
     """Render CSV download and optional Google Drive upload controls."""
-    df = topic_map_to_dataframe(entries)
-    csv_bytes = generate_csv_bytes(df)
+    csv_bytes = entries_to_csv_bytes(entries, st.session_state.get("entries_fp"))
     filename = generate_filename(topic)
 
     col1, col2 = st.columns(2)
@@ -1,22 +1,27 @@
-from typing import List
+import math
+from collections import Counter
+from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from config.settings import TABLE_PAGE_SIZE
 from services.csv_service import topic_map_to_dataframe
 
 
 def render_statistics(entries: List[dict]) -> None:
     """Render topic map summary statistics."""
     total = len(entries)
-    pillars = sum(1 for e in entries if e.get("level") == "Pillar")
-    clusters = sum(1 for e in entries if e.get("level") == "Cluster")
-    spokes = sum(1 for e in entries if e.get("level") == "Spoke")
-
-    intent_counts = {}
+    level_counts = Counter()
+    intent_counts = Counter()
     for e in entries:
-        intent = e.get("user_intent", "Unknown")
-        intent_counts[intent] = intent_counts.get(intent, 0) + 1
+        level_counts[e.get("level", "")] += 1
+        intent_counts[e.get("user_intent", "Unknown")] += 1
+
+    pillars = level_counts["Pillar"]
+    clusters = level_counts["Cluster"]
+    spokes = level_counts["Spoke"]
 
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Topics", total)
@@ -25,68 +30,110 @@ def render_statistics(entries: List[dict]) -> None:
     col4.metric("Spokes", spokes)
 
     st.markdown("**Intent Distribution:**")
-    intent_cols = st.columns(len(intent_counts))
-    for i, (intent, count) in enumerate(sorted(intent_counts.items())):
-        intent_cols[i].metric(intent, count)
+    st.bar_chart(pd.Series(dict(sorted(intent_counts.items())), name="Count"))
 
 
-def render_hierarchy(entries: List[dict]) -> None:
-    """Render a tree view of the topic hierarchy."""
+_BRANCH_LAST = "\u2514\u2500\u2500"
+_BRANCH_MID = "\u251c\u2500\u2500"
+_CLUSTER_INDENT = "&nbsp;" * 2
+_SPOKE_INDENT = "&nbsp;" * 6
+
+
+def _build_hierarchy_markdown(entries: List[dict]) -> Optional[str]:
+    """Build the tree view markdown, or None if the map has no Pillar."""
     pillar = next((e for e in entries if e.get("level") == "Pillar"), None)
     if not pillar:
-        st.warning("No Pillar topic found in the map.")
-        return
+        return None
 
     clusters = [e for e in entries if e.get("level") == "Cluster"]
-    spokes = [e for e in entries if e.get("level") == "Spoke"]
 
     # Build a lookup of cluster title -> spokes
     cluster_spokes = {}
-    for spoke in spokes:
-        parent = spoke.get("parent_topic", "")
-        if parent not in cluster_spokes:
-            cluster_spokes[parent] = []
-        cluster_spokes[parent].append(spoke)
+    for e in entries:
+        if e.get("level") == "Spoke":
+            cluster_spokes.setdefault(e.get("parent_topic", ""), []).append(e)
+
+    child_lists = [cluster_spokes.get(c.get("content_title", "Cluster"), []) for c in clusters]
+    tree_lines = [None] * (1 + len(clusters) + sum(map(len, child_lists)))
 
-    tree_lines = []
     p_title = pillar.get("content_title", "Pillar")
     p_score = pillar.get("priority_score", "")
-    tree_lines.append(f"**{p_title}** (Priority: {p_score})")
+    tree_lines[0] = f"**{p_title}** (Priority: {p_score})"
+    idx = 1
 
-    for j, cluster in enumerate(clusters):
+    last_cluster = len(clusters) - 1
+    for j, (cluster, child_spokes) in enumerate(zip(clusters, child_lists)):
         c_title = cluster.get("content_title", "Cluster")
         c_score = cluster.get("priority_score", "")
-        is_last_cluster = j == len(clusters) - 1
-        prefix = "\u2514\u2500\u2500" if is_last_cluster else "\u251c\u2500\u2500"
-        tree_lines.append(f"&nbsp;&nbsp;{prefix} **{c_title}** (Priority: {c_score})")
+        prefix = _BRANCH_LAST if j == last_cluster else _BRANCH_MID
+        tree_lines[idx] = f"{_CLUSTER_INDENT}{prefix} **{c_title}** (Priority: {c_score})"
+        idx += 1
 
-        child_spokes = cluster_spokes.get(c_title, [])
+        last_spoke = len(child_spokes) - 1
         for k, spoke in enumerate(child_spokes):
-            s_title = spoke.get("content_title", "Spoke")
-            s_score = spoke.get("priority_score", "")
-            is_last_spoke = k == len(child_spokes) - 1
-            indent = "&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;" if is_last_cluster else "&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;"
-            s_prefix = "\u2514\u2500\u2500" if is_last_spoke else "\u251c\u2500\u2500"
-            tree_lines.append(
-                f"{indent}{s_prefix} {s_title} (Priority: {s_score})"
+            s_prefix = _BRANCH_LAST if k == last_spoke else _BRANCH_MID
+            tree_lines[idx] = (
+                f"{_SPOKE_INDENT}{s_prefix} {spoke.get('content_title', 'Spoke')} "
+                f"(Priority: {spoke.get('priority_score', '')})"
             )
+            idx += 1
 
-    st.markdown("\n\n".join(tree_lines), unsafe_allow_html=True)
+    return "\n\n".join(tree_lines)
 
 
-def _color_level(row: pd.Series) -> list:
-    """Return row background colors based on Level column."""
-    level = row.get("Level", "")
-    if level == "Pillar":
-        return ["background-color: #dbeafe"] * len(row)
-    elif level == "Cluster":
-        return ["background-color: #dcfce7"] * len(row)
-    return [""] * len(row)
+def render_hierarchy(entries: List[dict]) -> None:
+    """Render a tree view of the topic hierarchy.
+
+    The rendered markdown is kept in session state until the next generation.
+    """
+    html = st.session_state.get("hierarchy_html")
+    if html is None:
+        html = _build_hierarchy_markdown(entries)
+        if html is None:
+            st.warning("No Pillar topic found in the map.")
+            return
+        st.session_state.hierarchy_html = html
+
+    st.markdown(html, unsafe_allow_html=True)
+
+
+_PILLAR_STYLE = "background-color: #dbeafe"
+_CLUSTER_STYLE = "background-color: #dcfce7"
+
+
+def _level_styles(frame: pd.DataFrame) -> pd.DataFrame:
+    """Return cell background colors for the whole frame based on the Level column."""
+    levels = frame["Level"].to_numpy()
+    row_styles = np.where(
+        levels == "Pillar",
+        _PILLAR_STYLE,
+        np.where(levels == "Cluster", _CLUSTER_STYLE, ""),
+    )
+    return pd.DataFrame(
+        np.repeat(row_styles[:, None], frame.shape[1], axis=1),
+        index=frame.index,
+        columns=frame.columns,
+    )
+
+
+def store_table_data(entries: List[dict]) -> pd.DataFrame:
+    """Build the table DataFrame and filter options once and keep them in session state."""
+    df = topic_map_to_dataframe(entries, st.session_state.get("entries_fp"))
+    st.session_state.topic_map_df = df
+    st.session_state.intent_options = df["User Intent"].cat.categories.tolist()
+    st.session_state.type_options = df["Content Type"].cat.categories.tolist()
+    st.session_state.pop("table_filter", None)
+    st.session_state.pop("table_style", None)
+    return df
 
 
 def render_data_table(entries: List[dict]) -> None:
     """Render the interactive, filterable data table."""
-    df = topic_map_to_dataframe(entries)
+    if "topic_map_df" not in st.session_state:
+        store_table_data(entries)
+    df = st.session_state.topic_map_df
+    intent_options = st.session_state.setdefault("intent_options", [])
+    type_options = st.session_state.setdefault("type_options", [])
 
     # Filters
     col1, col2, col3, col4 = st.columns(4)
@@ -97,14 +144,12 @@ def render_data_table(entries: List[dict]) -> None:
             default=["Pillar", "Cluster", "Spoke"],
         )
     with col2:
-        intent_options = df["User Intent"].unique().tolist()
         intent_filter = st.multiselect(
             "Filter by Intent",
             options=intent_options,
             default=intent_options,
         )
     with col3:
-        type_options = df["Content Type"].unique().tolist()
         type_filter = st.multiselect(
             "Filter by Content Type",
             options=type_options,
@@ -118,17 +163,50 @@ def render_data_table(entries: List[dict]) -> None:
             value=1,
         )
 
-    # Apply filters
-    filtered = df[
-        (df["Level"].isin(level_filter))
-        & (df["User Intent"].isin(intent_filter))
-        & (df["Content Type"].isin(type_filter))
-        & (df["Priority Score"] >= priority_filter)
-    ]
+    # Apply filters, reusing the previous result while the filters are unchanged
+    filter_key = (
+        tuple(level_filter),
+        tuple(intent_filter),
+        tuple(type_filter),
+        priority_filter,
+    )
+    cached_filter = st.session_state.get("table_filter")
+    if cached_filter is not None and cached_filter[0] == filter_key:
+        filtered = cached_filter[1]
+    else:
+        mask = (
+            np.isin(df["Level"].to_numpy(), level_filter)
+            & np.isin(df["User Intent"].to_numpy(), intent_filter)
+            & np.isin(df["Content Type"].to_numpy(), type_filter)
+            & (df["Priority Score"].to_numpy() >= priority_filter)
+        )
+        filtered = df.iloc[mask]
+        st.session_state.table_filter = (filter_key, filtered)
 
     st.write(f"Showing {len(filtered)} of {len(df)} topics")
 
-    styled = filtered.style.apply(_color_level, axis=1)
+    # Paginate large maps so only one page is styled and sent per rerun
+    page = 1
+    page_count = max(1, math.ceil(len(filtered) / TABLE_PAGE_SIZE))
+    if page_count > 1:
+        page = st.number_input(
+            "Page",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            step=1,
+        )
+    start = (page - 1) * TABLE_PAGE_SIZE
+    view = filtered.iloc[start : start + TABLE_PAGE_SIZE]
+
+    style_key = (filter_key, page)
+    cached_style = st.session_state.get("table_style")
+    if cached_style is not None and cached_style[0] == style_key:
+        styled = cached_style[1]
+    else:
+        styled = view.style.apply(_level_styles, axis=None)
+        st.session_state.table_style = (style_key, styled)
+
     st.dataframe(
         styled,
         use_container_width=True,
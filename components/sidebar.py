@@ -3,7 +3,7 @@ from typing import List, Optional
 
 import streamlit as st
 
-from config.settings import SCOPE_COMPREHENSIVE, SCOPE_FOCUSED
+from config.settings import GOOGLE_DRIVE_FOLDER_ID, SCOPE_COMPREHENSIVE, SCOPE_FOCUSED
 
 
 @dataclass
@@ -17,6 +17,7 @@ class UserInputs:
     existing_content: Optional[str]
     gdrive_enabled: bool
     gdrive_folder: Optional[str]
+    regenerate: bool = False
 
 
 def render_sidebar(gdrive_available: bool = False) -> UserInputs:
@@ -70,6 +71,12 @@ def render_sidebar(gdrive_available: bool = False) -> UserInputs:
             help="These topics will be excluded from the map",
         )
 
+        regenerate = st.checkbox(
+            "Regenerate (ignore cached results)",
+            value=False,
+            help="Call Claude again even if a map was recently generated for these inputs",
+        )
+
         # Google Drive integration
         gdrive_enabled = False
         gdrive_folder = None
@@ -77,21 +84,42 @@ def render_sidebar(gdrive_available: bool = False) -> UserInputs:
             st.divider()
             st.subheader("Google Drive")
             gdrive_enabled = st.toggle("Enable Google Drive Upload", value=False)
-            if gdrive_enabled:
+            if gdrive_enabled and GOOGLE_DRIVE_FOLDER_ID:
+                # upload_to_drive ignores the folder name when an ID is configured
+                st.caption(
+                    f"Uploads go to the configured folder (ID `{GOOGLE_DRIVE_FOLDER_ID}`)."
+                )
+            elif gdrive_enabled:
                 gdrive_folder = st.text_input(
                     "Drive Folder Name",
                     value="Topic Maps",
                     help="Folder in Google Drive to upload to (created if it doesn't exist)",
                 )
 
+        # Reuse the parsed inputs when nothing in the sidebar has changed
+        raw_key = (
+            topic,
+            scope,
+            industry,
+            audience,
+            geo_focus,
+            competitors_raw,
+            existing_content,
+            gdrive_enabled,
+            gdrive_folder,
+            regenerate,
+        )
+        if st.session_state.get("_inputs_key") == raw_key:
+            return st.session_state["_inputs"]
+
         # Parse competitors
         competitors = None
         if competitors_raw:
             competitors = [
-                c.strip() for c in competitors_raw.split(",") if c.strip()
+                c for c in (part.strip() for part in competitors_raw.split(",")) if c
             ]
 
-        return UserInputs(
+        inputs = UserInputs(
             topic=topic.strip() if topic else "",
             scope=scope,
             industry=industry.strip() if industry else None,
@@ -101,4 +129,8 @@ def render_sidebar(gdrive_available: bool = False) -> UserInputs:
             existing_content=existing_content.strip() if existing_content else None,
             gdrive_enabled=gdrive_enabled,
             gdrive_folder=gdrive_folder,
+            regenerate=regenerate,
         )
+        st.session_state["_inputs_key"] = raw_key
+        st.session_state["_inputs"] = inputs
+        return inputs
@@ -1,34 +1,68 @@
+import functools
 import os
+
 import streamlit as st
+from dotenv import load_dotenv
 
+load_dotenv()
 
-def get_secret(key: str, default: str = "") -> str:
-    """Retrieve a secret from Streamlit secrets or environment variables."""
+
+def _load_streamlit_secrets() -> dict:
+    """Read Streamlit secrets once, returning an empty dict if none are configured."""
     try:
-        if hasattr(st, "secrets") and key in st.secrets:
-            return st.secrets[key]
+        if hasattr(st, "secrets"):
+            return dict(st.secrets)
     except Exception:
         pass
-    from dotenv import load_dotenv
-    load_dotenv()
+    return {}
+
+
+_STREAMLIT_SECRETS = _load_streamlit_secrets()
+
+
+@functools.lru_cache(maxsize=None)
+def get_secret(key: str, default: str = "") -> str:
+    """Retrieve a secret from Streamlit secrets or environment variables."""
+    if key in _STREAMLIT_SECRETS:
+        return _STREAMLIT_SECRETS[key]
     return os.getenv(key, default)
 
 
+def _get_flag(key: str) -> bool:
+    """Return True if a secret is set to a truthy value such as 1, true or yes."""
+    return str(get_secret(key)).lower() in ("1", "true", "yes")
+
+
 # API Keys
 ANTHROPIC_API_KEY = get_secret("ANTHROPIC_API_KEY")
 TAVILY_API_KEY = get_secret("TAVILY_API_KEY")
 GOOGLE_CLIENT_ID = get_secret("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = get_secret("GOOGLE_CLIENT_SECRET")
+GOOGLE_DRIVE_FOLDER_ID = get_secret("GOOGLE_DRIVE_FOLDER_ID")  # optional, skips folder lookup
 
 # Claude model configuration
 CLAUDE_MODEL = "claude-sonnet-4-20250514"
 CLAUDE_MAX_TOKENS = 16000
 CLAUDE_TEMPERATURE = 0.3
+CLAUDE_MAX_ATTEMPTS = 8  # attempts per call on rate limits and transient errors
+CLAUDE_RETRY_MAX_WAIT = 60  # seconds, cap on a single backoff sleep
+
+# Claude response cache (set CLAUDE_CACHE_DISABLE=1 to always call the API)
+CLAUDE_CACHE_PATH = ".cache/claude_responses.sqlite3"
+CLAUDE_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+CLAUDE_CACHE_DISABLED = _get_flag("CLAUDE_CACHE_DISABLE")
+
+# Semantic cache for near-duplicate inputs (needs sentence-transformers and faiss-cpu)
+SEMANTIC_CACHE_ENABLED = _get_flag("SEMANTIC_CACHE_ENABLED")
+SEMANTIC_CACHE_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_CACHE_PATH = ".cache/semantic_cache.sqlite3"
+SEMANTIC_CACHE_THRESHOLD = 0.95  # minimum cosine similarity for a hit
 
 # Tavily configuration
 TAVILY_SEARCH_DEPTH = "advanced"
 TAVILY_MAX_RESULTS = 5
-TAVILY_RATE_LIMIT_DELAY = 0.5  # seconds between requests
+TAVILY_RATE_LIMIT_DELAY = 0.5  # minimum seconds between request starts
+TAVILY_CONCURRENCY = 4  # parallel research queries
 
 # Scope definitions
 SCOPE_FOCUSED = "Focused (15-25 topics)"
@@ -39,6 +73,15 @@ SCOPE_RANGES = {
     SCOPE_COMPREHENSIVE: (40, 75),
 }
 
+# Generation result cache (keyed on a hash of the user inputs;
+# set RESULT_CACHE_DISABLE=1 to always regenerate)
+RESULT_CACHE_DIR = ".cache"
+RESULT_CACHE_TTL = 24 * 60 * 60  # seconds
+RESULT_CACHE_DISABLED = _get_flag("RESULT_CACHE_DISABLE")
+
+# Results table configuration
+TABLE_PAGE_SIZE = 25  # rows per page in the data table
+
 # App metadata
 APP_TITLE = "Topic Map Generator"
 APP_ICON = "\U0001f5fa\ufe0f"
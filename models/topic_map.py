@@ -1,32 +1,37 @@
-from dataclasses import dataclass, field
+import hashlib
+import json
+from dataclasses import dataclass, field, fields
 from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class TopicMapEntry:
-    level: str  # "Pillar" | "Cluster" | "Spoke"
-    content_title: str
-    primary_keyword: str
-    user_intent: str  # "Informational" | "Navigational" | "Commercial Investigation" | "Transactional"
-    semantic_entities: List[str]  # 3-5 related entities
-    content_type: str
-    rag_directions: str
-    paa_questions: List[str]
-    citations: List[str]
-    parent_topic: Optional[str]
-    priority_score: int  # 1-5
-    word_count_range: str
-    internal_link_targets: List[str]
-
-
-VALID_LEVELS = {"Pillar", "Cluster", "Spoke"}
-
-VALID_INTENTS = {
+    level: str = ""  # "Pillar" | "Cluster" | "Spoke"
+    content_title: str = ""
+    primary_keyword: str = ""
+    user_intent: str = ""  # "Informational" | "Navigational" | "Commercial Investigation" | "Transactional"
+    semantic_entities: List[str] = field(default_factory=list)  # 3-5 related entities
+    content_type: str = ""
+    rag_directions: str = ""
+    paa_questions: List[str] = field(default_factory=list)
+    citations: List[str] = field(default_factory=list)
+    parent_topic: Optional[str] = ""
+    priority_score: int = 3  # 1-5
+    word_count_range: str = ""
+    internal_link_targets: List[str] = field(default_factory=list)
+
+
+_ENTRY_FIELDS = frozenset(f.name for f in fields(TopicMapEntry))
+
+
+VALID_LEVELS = frozenset({"Pillar", "Cluster", "Spoke"})
+
+VALID_INTENTS = frozenset({
     "Informational",
     "Navigational",
     "Commercial Investigation",
     "Transactional",
-}
+})
 
 CONTENT_TYPES = {
     "Pillar Page": "3000-5000",
@@ -45,71 +50,90 @@ CONTENT_TYPES = {
     "Product Page": "800-1500",
 }
 
+_REQUIRED_FIELDS = frozenset({
+    "level",
+    "content_title",
+    "primary_keyword",
+    "user_intent",
+    "semantic_entities",
+    "content_type",
+    "rag_directions",
+    "paa_questions",
+    "citations",
+    "parent_topic",
+    "priority_score",
+    "word_count_range",
+    "internal_link_targets",
+})
+
 
 def validate_entry(entry: dict) -> List[str]:
     """Validate a single topic map entry dict. Returns list of error messages."""
+    missing = _REQUIRED_FIELDS - entry.keys()
+    if missing:
+        return [f"Missing required field: {f}" for f in sorted(missing)]
+
     errors = []
 
-    required_fields = [
-        "level",
-        "content_title",
-        "primary_keyword",
-        "user_intent",
-        "semantic_entities",
-        "content_type",
-        "rag_directions",
-        "paa_questions",
-        "citations",
-        "parent_topic",
-        "priority_score",
-        "word_count_range",
-        "internal_link_targets",
-    ]
-
-    for f in required_fields:
-        if f not in entry:
-            errors.append(f"Missing required field: {f}")
-
-    if not errors:
-        if entry["level"] not in VALID_LEVELS:
-            errors.append(
-                f"Invalid level '{entry['level']}'. Must be one of: {VALID_LEVELS}"
-            )
+    if entry["level"] not in VALID_LEVELS:
+        errors.append(
+            f"Invalid level '{entry['level']}'. Must be one of: {', '.join(sorted(VALID_LEVELS))}"
+        )
+
+    if entry["user_intent"] not in VALID_INTENTS:
+        errors.append(
+            f"Invalid user_intent '{entry['user_intent']}'. Must be one of: {', '.join(sorted(VALID_INTENTS))}"
+        )
+
+    score = entry.get("priority_score", 0)
+    if not isinstance(score, int) or score < 1 or score > 5:
+        errors.append(
+            f"Invalid priority_score '{score}'. Must be integer 1-5"
+        )
+
+    entities = entry.get("semantic_entities", [])
+    if not isinstance(entities, list) or len(entities) < 3 or len(entities) > 5:
+        errors.append(
+            f"semantic_entities must have 3-5 items, got {len(entities) if isinstance(entities, list) else 'non-list'}"
+        )
+
+    paa = entry.get("paa_questions", [])
+    if not isinstance(paa, list) or len(paa) < 2:
+        errors.append(
+            f"paa_questions must have at least 2 items, got {len(paa) if isinstance(paa, list) else 'non-list'}"
+        )
+
+    citations = entry.get("citations", [])
+    if not isinstance(citations, list) or len(citations) < 1:
+        errors.append(
+            f"citations must have at least 1 item, got {len(citations) if isinstance(citations, list) else 'non-list'}"
+        )
 
-        if entry["user_intent"] not in VALID_INTENTS:
-            errors.append(
-                f"Invalid user_intent '{entry['user_intent']}'. Must be one of: {VALID_INTENTS}"
-            )
+    return errors
 
-        score = entry.get("priority_score", 0)
-        if not isinstance(score, int) or score < 1 or score > 5:
-            errors.append(
-                f"Invalid priority_score '{score}'. Must be integer 1-5"
-            )
 
-        entities = entry.get("semantic_entities", [])
-        if not isinstance(entities, list) or len(entities) < 3 or len(entities) > 5:
-            errors.append(
-                f"semantic_entities must have 3-5 items, got {len(entities) if isinstance(entities, list) else 'non-list'}"
-            )
+def entries_fingerprint(entries: List[dict]) -> str:
+    """Return a short, stable content hash for a list of topic map entries."""
+    return hashlib.blake2b(
+        json.dumps(entries, sort_keys=True, default=str).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
 
-        paa = entry.get("paa_questions", [])
-        if not isinstance(paa, list) or len(paa) < 2:
-            errors.append(
-                f"paa_questions must have at least 2 items, got {len(paa) if isinstance(paa, list) else 'non-list'}"
-            )
 
-        citations = entry.get("citations", [])
-        if not isinstance(citations, list) or len(citations) < 1:
-            errors.append(
-                f"citations must have at least 1 item, got {len(citations) if isinstance(citations, list) else 'non-list'}"
-            )
+def is_critical_error(error: str) -> bool:
+    """Return True for validation errors that make a topic map unusable."""
+    return "Missing required field" in error or "Expected exactly 1 Pillar" in error
 
-    return errors
 
+def validate_topic_map(
+    entries: List[dict],
+    stop_on_critical: bool = False,
+) -> List[str]:
+    """Validate the full topic map structure. Returns list of error messages.
 
-def validate_topic_map(entries: List[dict]) -> List[str]:
-    """Validate the full topic map structure. Returns list of error messages."""
+    With ``stop_on_critical`` validation stops at the first entry with a
+    critical error instead of collecting every error.
+    """
     errors = []
 
     # Validate each entry individually
@@ -117,14 +141,24 @@ def validate_topic_map(entries: List[dict]) -> List[str]:
         entry_errors = validate_entry(entry)
         for err in entry_errors:
             errors.append(f"Entry {i} ({entry.get('content_title', 'unknown')}): {err}")
+        # Missing-field errors are returned on their own, so checking one suffices
+        if stop_on_critical and entry_errors and is_critical_error(entry_errors[0]):
+            return errors
 
     if errors:
         return errors
 
     # Structural validations
-    pillars = [e for e in entries if e["level"] == "Pillar"]
-    clusters = [e for e in entries if e["level"] == "Cluster"]
-    spokes = [e for e in entries if e["level"] == "Spoke"]
+    pillars, clusters, spokes, cluster_titles = [], [], [], set()
+    for e in entries:
+        level = e["level"]
+        if level == "Pillar":
+            pillars.append(e)
+        elif level == "Cluster":
+            clusters.append(e)
+            cluster_titles.add(e["content_title"])
+        else:
+            spokes.append(e)
 
     if len(pillars) != 1:
         errors.append(f"Expected exactly 1 Pillar, found {len(pillars)}")
@@ -132,8 +166,6 @@ def validate_topic_map(entries: List[dict]) -> List[str]:
 
     pillar_title = pillars[0]["content_title"]
 
-    cluster_titles = {c["content_title"] for c in clusters}
-
     for cluster in clusters:
         parent = cluster.get("parent_topic", "")
         if parent and parent != pillar_title:
@@ -154,19 +186,8 @@ def validate_topic_map(entries: List[dict]) -> List[str]:
 
 
 def dict_to_entry(data: dict) -> TopicMapEntry:
-    """Convert a dict to a TopicMapEntry dataclass instance."""
-    return TopicMapEntry(
-        level=data.get("level", ""),
-        content_title=data.get("content_title", ""),
-        primary_keyword=data.get("primary_keyword", ""),
-        user_intent=data.get("user_intent", ""),
-        semantic_entities=data.get("semantic_entities", []),
-        content_type=data.get("content_type", ""),
-        rag_directions=data.get("rag_directions", ""),
-        paa_questions=data.get("paa_questions", []),
-        citations=data.get("citations", []),
-        parent_topic=data.get("parent_topic", ""),
-        priority_score=data.get("priority_score", 3),
-        word_count_range=data.get("word_count_range", ""),
-        internal_link_targets=data.get("internal_link_targets", []),
-    )
+    """Convert a dict to a TopicMapEntry dataclass instance.
+
+    Missing fields fall back to the dataclass defaults; unknown keys are ignored.
+    """
+    return TopicMapEntry(**{key: data[key] for key in _ENTRY_FIELDS.intersection(data)})
@@ -63,7 +63,9 @@ Provide specific formatting and structural instructions that ensure the eventual
 | 1 | Long-tail or highly competitive; nice-to-have for comprehensive coverage |
 """
 
-TOPIC_MAP_USER_PROMPT = """## Input
+# The user prompt is split so the long, per-run invariant context (inputs and
+# research) can be sent as a prompt-cached prefix on every call in a run.
+TOPIC_MAP_CONTEXT_PROMPT = """## Input
 
 **Topic:** {topic}
 **Scope:** {scope}
@@ -75,9 +77,9 @@ TOPIC_MAP_USER_PROMPT = """## Input
 
 ## Research Data
 
-{compiled_research}
+{compiled_research}"""
 
-## Instructions
+TOPIC_MAP_INSTRUCTIONS_PROMPT = """## Instructions
 
 Based on the research data above, generate a complete topical map as a JSON array. Each element must have these exact keys:
 
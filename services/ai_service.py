@@ -1,74 +1,301 @@
-import json
+import random
 import re
 import time
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import anthropic
+import httpx
+import orjson
+import streamlit as st
 
 from config.settings import (
     ANTHROPIC_API_KEY,
+    CLAUDE_MAX_ATTEMPTS,
     CLAUDE_MAX_TOKENS,
     CLAUDE_MODEL,
+    CLAUDE_RETRY_MAX_WAIT,
     CLAUDE_TEMPERATURE,
     SCOPE_FOCUSED,
 )
-from models.topic_map import validate_topic_map
+from models.topic_map import is_critical_error, validate_topic_map
 from prompts.topic_map_prompts import (
     CONTINUATION_PROMPT,
     JSON_FIX_PROMPT,
+    TOPIC_MAP_CONTEXT_PROMPT,
+    TOPIC_MAP_INSTRUCTIONS_PROMPT,
     TOPIC_MAP_SYSTEM_PROMPT,
-    TOPIC_MAP_USER_PROMPT,
 )
+from services import response_cache, semantic_cache
+
+
+_OPEN_FENCE_RE = re.compile(r"^```(?:json)?\s*\n?")
+_CLOSE_FENCE_RE = re.compile(r"\n?```$")
+_TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+# Opening bracket of the payload: an array of objects, or an empty array
+_ARRAY_START_RE = re.compile(r"\[\s*[{\]]")
 
 
 def _clean_json_response(text: str) -> str:
     """Strip markdown fences and clean common JSON issues from Claude output."""
     text = text.strip()
-    # Remove markdown code fences
-    text = re.sub(r"^```(?:json)?\s*\n?", "", text)
-    text = re.sub(r"\n?```\s*$", "", text)
+    # Remove markdown code fences (most responses have none)
+    if text.startswith("```"):
+        text = _OPEN_FENCE_RE.sub("", text)
+    if text.endswith("```"):
+        text = _CLOSE_FENCE_RE.sub("", text)
     text = text.strip()
     # Remove trailing commas before ] or }
-    text = re.sub(r",\s*([\]}])", r"\1", text)
-    return text
+    return _TRAILING_COMMA_RE.sub(r"\1", text)
 
 
 def _parse_json(text: str) -> Optional[List[dict]]:
     """Attempt to parse JSON from text, returning None on failure."""
     cleaned = _clean_json_response(text)
     try:
-        data = json.loads(cleaned)
+        data = orjson.loads(cleaned)
         if isinstance(data, list):
             return data
         return None
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
+        return None
+
+
+def _repair_json(text: str) -> Optional[List[dict]]:
+    """Try cheap deterministic repairs on a response that failed to parse.
+
+    Handles commentary around the array and an array whose closing bracket
+    is missing after the last complete object, with or without prose after
+    it. Returns None if neither helps.
+    """
+    cleaned = _clean_json_response(text)
+    match = _ARRAY_START_RE.search(cleaned)
+    if match is None:
         return None
+    start = match.start()
+
+    # Drop any prose before the array or after its closing bracket
+    end = cleaned.rfind("]")
+    if end > start:
+        entries = _parse_json(cleaned[start : end + 1])
+        if entries is not None:
+            return entries
+
+    # Close an array that stops after a complete object, dropping anything
+    # written after that object
+    end = cleaned.rfind("}")
+    if end > start:
+        return _parse_json(cleaned[start : end + 1] + "]")
+    return None
+
+
+class _JsonScanner:
+    """Find brackets and braces outside JSON strings, across any number of chunks."""
+
+    def __init__(self) -> None:
+        self._in_string = False
+        self._escape = False
+
+    def scan(self, text: str):
+        """Yield (index, char) for every structural bracket or brace in text."""
+        for i, ch in enumerate(text):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "[]{}":
+                yield i, ch
+
+
+class _ArrayCloseTracker:
+    """Detect, chunk by chunk, when a response's JSON array payload closes.
+
+    Tracking arms at the first "[" that opens an array of objects, so
+    brackets in any prose before the payload are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._scanner = _JsonScanner()
+        self._pending = ""  # text seen before the payload starts
+        self._armed = False
+        self._depth = 0
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of text. Returns True once the array has closed."""
+        if not self._armed:
+            self._pending += chunk
+            match = _ARRAY_START_RE.search(self._pending)
+            if match is None:
+                return False
+            self._armed = True
+            chunk = self._pending[match.start() :]
+            self._pending = ""
+        for _, ch in self._scanner.scan(chunk):
+            self._depth += 1 if ch in "[{" else -1
+            if self._depth == 0:
+                return True
+        return False
+
+
+def _split_complete_objects(text: str) -> List[dict]:
+    """Return every complete top-level object in a possibly truncated JSON array.
+
+    Walks the text once and parses each object as soon as it closes.
+    Malformed objects are skipped, so one bad entry doesn't lose the rest.
+    Text that starts partway through an object (as continuations often do)
+    is resynchronised at the next opening bracket after the stray closer.
+    """
+    objects = []
+    depth = 0
+    base = None  # depth at which entry objects open: 1 inside "[", else 0
+    start = -1
+
+    for i, ch in _JsonScanner().scan(text):
+        if ch in "[{":
+            if base is None:
+                base = 1 if ch == "[" else 0
+            if ch == "{" and depth == base:
+                start = i
+            depth += 1
+            continue
+
+        depth -= 1
+        if base is None or depth < base:
+            # Closed something opened before the text began: start over
+            depth, base, start = 0, None, -1
+        elif ch == "}" and depth == base and start != -1:
+            try:
+                obj = orjson.loads(_TRAILING_COMMA_RE.sub(r"\1", text[start : i + 1]))
+            except orjson.JSONDecodeError:
+                obj = None
+            if isinstance(obj, dict):
+                objects.append(obj)
+            start = -1
+
+    return objects
+
+
+def _is_complete_array(text: str) -> bool:
+    """Return True if the JSON array payload in a full response closes."""
+    return _ArrayCloseTracker().feed(text)
+
+
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+@st.cache_resource(show_spinner=False)
+def _get_client() -> anthropic.Anthropic:
+    """Return a shared Anthropic client, created once per process.
+
+    SDK retries are disabled because _call_claude applies its own backoff.
+    """
+    return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, max_retries=0)
+
+
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504, 529})
+# Error event types that can arrive mid-stream, after the 200 status line
+_RETRYABLE_STREAM_ERRORS = frozenset({"overloaded_error", "api_error"})
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Return True for connection failures and transient API errors."""
+    if isinstance(error, (anthropic.APIConnectionError, httpx.TransportError)):
+        # httpx transport errors raised while reading a stream body are not
+        # wrapped by the SDK
+        return True
+    if error.status_code in _RETRYABLE_STATUS_CODES:
+        return True
+    body = error.body
+    if isinstance(body, dict):
+        body = body.get("error", body)
+    return isinstance(body, dict) and body.get("type") in _RETRYABLE_STREAM_ERRORS
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying: the server's retry-after, else jittered backoff."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(CLAUDE_RETRY_MAX_WAIT, float(retry_after))
+        except ValueError:
+            pass
+    return min(CLAUDE_RETRY_MAX_WAIT, 2**attempt + random.uniform(0, 1))
 
 
 def _call_claude(
     system: str,
     user_message: str,
     max_tokens: int = CLAUDE_MAX_TOKENS,
+    cached_context: Optional[str] = None,
+    cache_writes: Optional[List[Tuple[str, str]]] = None,
+    use_cache: bool = True,
 ) -> str:
-    """Make a single Claude API call with retry on rate limit."""
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+    """Make a single streamed Claude API call with retry on transient errors.
+
+    Returns the response text. Reading stops as soon as the JSON array
+    payload closes, so trailing commentary isn't waited for.
+
+    The system prompt and ``cached_context`` (sent ahead of ``user_message``)
+    are marked for Anthropic prompt caching, so repeat calls within a run
+    reuse them. Responses are also cached on disk by model, temperature,
+    prompts and max_tokens. Fresh responses are not written straight away:
+    their (key, text) pairs are appended to ``cache_writes`` so the caller
+    can store them once the result has passed validation. Pass
+    ``use_cache=False`` to skip the lookup and always call the API.
+    """
+    cache_key = response_cache.make_key(
+        CLAUDE_MODEL,
+        CLAUDE_TEMPERATURE,
+        max_tokens,
+        system,
+        cached_context or "",
+        user_message,
+    )
+    cached = response_cache.lookup(cache_key) if use_cache else None
+    if cached is not None:
+        return cached
+
+    client = _get_client()
 
-    for attempt in range(3):
+    content = []
+    if cached_context:
+        content.append(
+            {"type": "text", "text": cached_context, "cache_control": _EPHEMERAL}
+        )
+    content.append({"type": "text", "text": user_message})
+
+    for attempt in range(CLAUDE_MAX_ATTEMPTS):
         try:
-            response = client.messages.create(
+            tracker = _ArrayCloseTracker()
+            parts = []
+            with client.messages.stream(
                 model=CLAUDE_MODEL,
                 max_tokens=max_tokens,
                 temperature=CLAUDE_TEMPERATURE,
-                system=system,
-                messages=[{"role": "user", "content": user_message}],
-            )
-            return response.content[0].text
-        except anthropic.RateLimitError:
-            if attempt < 2:
-                wait_time = 2 ** (attempt + 1)
-                time.sleep(wait_time)
-            else:
+                system=[{"type": "text", "text": system, "cache_control": _EPHEMERAL}],
+                messages=[{"role": "user", "content": content}],
+            ) as stream:
+                for chunk in stream.text_stream:
+                    parts.append(chunk)
+                    if tracker.feed(chunk):
+                        break
+            text = "".join(parts)
+            if cache_writes is not None:
+                cache_writes.append((cache_key, text))
+            return text
+        except (
+            anthropic.APIConnectionError,
+            anthropic.APIStatusError,
+            httpx.TransportError,
+        ) as e:
+            if not _is_retryable(e) or attempt == CLAUDE_MAX_ATTEMPTS - 1:
                 raise
+            time.sleep(_retry_delay(e, attempt))
     return ""
 
 
@@ -81,18 +308,30 @@ def generate_topic_map(
     competitors: str,
     existing_content: str,
     compiled_research: str,
+    use_cache: bool = True,
 ) -> List[dict]:
     """Generate a topic map using Claude AI based on research data.
 
-    Returns a list of validated topic map entry dicts.
+    With ``use_cache=False`` cached responses and maps are ignored (fresh
+    results are still stored). Returns a list of validated topic map entry
+    dicts.
     Raises ValueError if generation or validation fails.
     """
     if not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY is not configured.")
 
+    # Reuse a map generated for near-identical inputs with the same scope
+    semantic_query = " | ".join(
+        [topic, industry, audience, geo_focus, competitors, existing_content]
+    )
+    cached_entries = semantic_cache.lookup(scope, semantic_query) if use_cache else None
+    if cached_entries is not None:
+        return cached_entries
+
     topic_count_guidance = "15-25" if scope == SCOPE_FOCUSED else "40-75"
 
-    user_prompt = TOPIC_MAP_USER_PROMPT.format(
+    # Inputs and research are identical across every call in this run
+    context_prompt = TOPIC_MAP_CONTEXT_PROMPT.format(
         topic=topic,
         scope=scope,
         industry=industry or "Not specified",
@@ -101,24 +340,54 @@ def generate_topic_map(
         competitors=competitors or "None provided",
         existing_content=existing_content or "None provided",
         compiled_research=compiled_research,
+    )
+    instructions_prompt = TOPIC_MAP_INSTRUCTIONS_PROMPT.format(
         topic_count_guidance=topic_count_guidance,
     )
 
+    # Responses are only cached once the map they produce passes validation
+    cache_writes: List[Tuple[str, str]] = []
+
     # First attempt
-    raw_response = _call_claude(TOPIC_MAP_SYSTEM_PROMPT, user_prompt)
+    raw_response = _call_claude(
+        TOPIC_MAP_SYSTEM_PROMPT,
+        instructions_prompt,
+        cached_context=context_prompt,
+        cache_writes=cache_writes,
+        use_cache=use_cache,
+    )
     entries = _parse_json(raw_response)
+    # A response that parses is complete; only scan the text when it doesn't
+    raw_complete = entries is not None or _is_complete_array(raw_response)
 
-    # If JSON parsing failed, retry with fix prompt
+    # Truncated output: keep its complete objects and let the continuation
+    # below supply the rest instead of spending a fix round trip on it
+    salvaged = None
+    if entries is None and not raw_complete:
+        salvaged = _split_complete_objects(raw_response)
+        entries = salvaged or None
+
+    # Try local repairs before spending another API call on the fix prompt
+    if entries is None:
+        entries = _repair_json(raw_response)
+
+    # If JSON parsing still failed, retry with fix prompt
     if entries is None:
         try:
             cleaned = _clean_json_response(raw_response)
-            json.loads(cleaned)
-        except json.JSONDecodeError as e:
+            orjson.loads(cleaned)
+        except orjson.JSONDecodeError as e:
             fix_prompt = JSON_FIX_PROMPT.format(
                 error=str(e),
                 output=raw_response[:8000],
             )
-            fix_response = _call_claude(TOPIC_MAP_SYSTEM_PROMPT, fix_prompt)
+            fix_response = _call_claude(
+                TOPIC_MAP_SYSTEM_PROMPT,
+                fix_prompt,
+                cached_context=context_prompt,
+                cache_writes=cache_writes,
+                use_cache=use_cache,
+            )
             entries = _parse_json(fix_response)
 
     if entries is None:
@@ -127,44 +396,48 @@ def generate_topic_map(
             "Please try generating again."
         )
 
-    # Check if the response was truncated (incomplete JSON)
-    # If the last entry seems incomplete, try continuation
-    if raw_response.rstrip()[-1] != "]":
+    # If the streamed array never closed the response was truncated,
+    # so ask for a continuation
+    if not raw_complete:
         last_chunk = raw_response[-500:]
         continuation_prompt = CONTINUATION_PROMPT.format(last_chunk=last_chunk)
-        continuation = _call_claude(TOPIC_MAP_SYSTEM_PROMPT, continuation_prompt)
-        continuation_entries = _parse_json(continuation)
+        continuation = _call_claude(
+            TOPIC_MAP_SYSTEM_PROMPT,
+            continuation_prompt,
+            cached_context=context_prompt,
+            cache_writes=cache_writes,
+            use_cache=use_cache,
+        )
+        # A continuation often starts mid-array without an opening bracket
+        continuation_entries = _parse_json(continuation) or _split_complete_objects(
+            continuation
+        )
 
         if continuation_entries:
-            # Merge: raw_response had incomplete JSON, try to salvage
-            # Parse what we can from the original, then add continuation
-            try:
-                # Try to fix truncated JSON by closing the array
-                truncated = _clean_json_response(raw_response)
-                # Find the last complete object
-                last_brace = truncated.rfind("}")
-                if last_brace > 0:
-                    fixed = truncated[: last_brace + 1] + "]"
-                    base_entries = json.loads(fixed)
-                    if isinstance(base_entries, list):
-                        entries = base_entries + continuation_entries
-            except json.JSONDecodeError:
+            # Merge: raw_response had incomplete JSON, so keep its complete
+            # objects and add the continuation
+            base_entries = salvaged or _split_complete_objects(raw_response)
+            if base_entries:
+                entries = base_entries + continuation_entries
+            elif len(continuation_entries) > 10:
                 # If we can't salvage, just use continuation if it's enough
-                if len(continuation_entries) > 10:
-                    entries = continuation_entries
+                entries = continuation_entries
 
     if not entries:
         raise ValueError("No topic map entries were generated.")
 
     # Validate the topic map
-    errors = validate_topic_map(entries)
+    errors = validate_topic_map(entries, stop_on_critical=True)
     if errors:
         # Log warnings but don't fail — partial results are still useful
         # Only fail on critical issues
-        critical_errors = [e for e in errors if "Missing required field" in e or "Expected exactly 1 Pillar" in e]
+        critical_errors = [e for e in errors if is_critical_error(e)]
         if critical_errors:
             raise ValueError(
                 f"Topic map validation failed:\n" + "\n".join(critical_errors[:10])
             )
 
+    for cache_key, text in cache_writes:
+        response_cache.update(cache_key, text)
+    semantic_cache.store(scope, semantic_query, entries)
     return entries
@@ -0,0 +1,14 @@
+import sqlite3
+from pathlib import Path
+
+
+def connect(path: str, schema: str) -> sqlite3.Connection:
+    """Open a cache database, creating its directory and table on first use.
+
+    ``schema`` is a ``CREATE TABLE IF NOT EXISTS`` statement for the cache table.
+    """
+    db_path = Path(path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute(schema)
+    return conn
@@ -1,8 +1,13 @@
+import csv
+import io
 import re
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 import pandas as pd
+import streamlit as st
+
+from models.topic_map import entries_fingerprint
 
 
 def _join_list(items) -> str:
@@ -12,39 +17,102 @@ def _join_list(items) -> str:
     return str(items)
 
 
-def topic_map_to_dataframe(entries: List[dict]) -> pd.DataFrame:
-    """Convert a list of topic map entry dicts to a pandas DataFrame."""
-    rows = []
-    for entry in entries:
-        rows.append(
-            {
-                "Level": entry.get("level", ""),
-                "Content Title": entry.get("content_title", ""),
-                "Primary Keyword": entry.get("primary_keyword", ""),
-                "User Intent": entry.get("user_intent", ""),
-                "Semantic Entities": _join_list(entry.get("semantic_entities", [])),
-                "Content Type": entry.get("content_type", ""),
-                "RAG Directions": entry.get("rag_directions", ""),
-                "PAA Questions": _join_list(entry.get("paa_questions", [])),
-                "Citations": _join_list(entry.get("citations", [])),
-                "Parent Topic": entry.get("parent_topic", ""),
-                "Priority Score": entry.get("priority_score", 0),
-                "Word Count Range": entry.get("word_count_range", ""),
-                "Internal Link Targets": _join_list(
-                    entry.get("internal_link_targets", [])
-                ),
-            }
-        )
-    return pd.DataFrame(rows)
-
-
-def generate_csv_bytes(df: pd.DataFrame) -> bytes:
-    """Generate CSV content as bytes from a DataFrame."""
-    return df.to_csv(index=False).encode("utf-8")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+# (CSV column, entry key, default) in export order
+_COLUMNS = (
+    ("Level", "level", ""),
+    ("Content Title", "content_title", ""),
+    ("Primary Keyword", "primary_keyword", ""),
+    ("User Intent", "user_intent", ""),
+    ("Semantic Entities", "semantic_entities", []),
+    ("Content Type", "content_type", ""),
+    ("RAG Directions", "rag_directions", ""),
+    ("PAA Questions", "paa_questions", []),
+    ("Citations", "citations", []),
+    ("Parent Topic", "parent_topic", ""),
+    ("Priority Score", "priority_score", 0),
+    ("Word Count Range", "word_count_range", ""),
+    ("Internal Link Targets", "internal_link_targets", []),
+)
+
+_LIST_COLUMNS = (
+    "Semantic Entities",
+    "PAA Questions",
+    "Citations",
+    "Internal Link Targets",
+)
+
+
+def topic_map_to_dataframe(
+    entries: List[dict],
+    entries_fp: Optional[str] = None,
+) -> pd.DataFrame:
+    """Convert a list of topic map entry dicts to a pandas DataFrame.
+
+    Cached by the entries fingerprint so reruns and multiple tabs share one
+    frame. Pass a precomputed ``entries_fp`` to skip fingerprinting.
+    """
+    if entries_fp is None:
+        entries_fp = entries_fingerprint(entries)
+    return _cached_dataframe(entries_fp, entries)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_dataframe(entries_fp: str, _entries: List[dict]) -> pd.DataFrame:
+    """Build the DataFrame; Streamlit keys the cache on ``entries_fp`` only."""
+    return _build_dataframe(_entries)
+
+
+def _build_dataframe(entries: List[dict]) -> pd.DataFrame:
+    """Convert topic map entry dicts to a DataFrame without caching."""
+    df = pd.DataFrame(
+        {
+            column: [entry.get(key, default) for entry in entries]
+            for column, key, default in _COLUMNS
+        }
+    )
+    for column in _LIST_COLUMNS:
+        df[column] = df[column].map(_join_list)
+    for col in ("Level", "User Intent", "Content Type"):
+        # Categories never include nulls, so keep them visible and filterable
+        df[col] = df[col].fillna("Unknown").astype("category")
+    return df
+
+
+def entries_to_csv_bytes(
+    entries: List[dict],
+    entries_fp: Optional[str] = None,
+) -> bytes:
+    """Generate CSV content as bytes directly from topic map entry dicts.
+
+    Writes with the stdlib csv module, skipping DataFrame construction, and is
+    cached by the entries fingerprint like ``topic_map_to_dataframe``.
+    """
+    if entries_fp is None:
+        entries_fp = entries_fingerprint(entries)
+    return _cached_csv_bytes(entries_fp, entries)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_csv_bytes(entries_fp: str, _entries: List[dict]) -> bytes:
+    """Encode the CSV; Streamlit keys the cache on ``entries_fp`` only."""
+    list_indexes = [
+        i for i, (column, _, _) in enumerate(_COLUMNS) if column in _LIST_COLUMNS
+    ]
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow([column for column, _, _ in _COLUMNS])
+    for entry in _entries:
+        row = [entry.get(key, default) for _, key, default in _COLUMNS]
+        for i in list_indexes:
+            row[i] = _join_list(row[i])
+        writer.writerow(row)
+    return buf.getvalue().encode("utf-8")
 
 
 def generate_filename(topic: str) -> str:
     """Generate a filename for the CSV export."""
-    slug = re.sub(r"[^a-z0-9]+", "_", topic.lower()).strip("_")
+    slug = _SLUG_RE.sub("_", topic.lower()).strip("_")
     date_str = datetime.now().strftime("%Y%m%d")
     return f"topical_map_{slug}_{date_str}.csv"
@@ -1,7 +1,12 @@
 import io
+import threading
 from typing import Optional
 
-from config.settings import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
+from config.settings import (
+    GOOGLE_CLIENT_ID,
+    GOOGLE_CLIENT_SECRET,
+    GOOGLE_DRIVE_FOLDER_ID,
+)
 
 
 def _get_credentials():
@@ -45,8 +50,37 @@ def _get_credentials():
     return creds
 
 
+# Reused across uploads; rebuilt only when the credentials stop being valid.
+# The service's httplib2 transport is not thread-safe and Streamlit runs each
+# session in its own thread, so all Drive calls go through _drive_lock.
+_drive_service = None
+_drive_credentials = None
+_drive_lock = threading.Lock()
+
+# folder name -> Drive folder ID, resolved once per process
+_folder_ids = {}
+
+
+def _get_service():
+    """Return a cached Drive v3 service, rebuilding it if credentials expired."""
+    global _drive_service, _drive_credentials
+
+    if _drive_service is None or not _drive_credentials.valid:
+        from googleapiclient.discovery import build
+
+        _drive_credentials = _get_credentials()
+        _drive_service = build("drive", "v3", credentials=_drive_credentials)
+    return _drive_service
+
+
 def _find_or_create_folder(service, folder_name: str) -> str:
-    """Find a folder by name in Google Drive, or create it."""
+    """Find a folder by name in Google Drive, or create it.
+
+    Resolved IDs are memoized so repeat uploads skip the lookup.
+    """
+    if folder_name in _folder_ids:
+        return _folder_ids[folder_name]
+
     query = (
         f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' "
         f"and trashed=false"
@@ -55,15 +89,18 @@ def _find_or_create_folder(service, folder_name: str) -> str:
     files = results.get("files", [])
 
     if files:
-        return files[0]["id"]
+        folder_id = files[0]["id"]
+    else:
+        # Create the folder
+        file_metadata = {
+            "name": folder_name,
+            "mimeType": "application/vnd.google-apps.folder",
+        }
+        folder = service.files().create(body=file_metadata, fields="id").execute()
+        folder_id = folder["id"]
 
-    # Create the folder
-    file_metadata = {
-        "name": folder_name,
-        "mimeType": "application/vnd.google-apps.folder",
-    }
-    folder = service.files().create(body=file_metadata, fields="id").execute()
-    return folder["id"]
+    _folder_ids[folder_name] = folder_id
+    return folder_id
 
 
 def upload_to_drive(
@@ -73,40 +110,44 @@ def upload_to_drive(
 ) -> Optional[str]:
     """Upload a CSV file to Google Drive and return a shareable link.
 
+    If GOOGLE_DRIVE_FOLDER_ID is configured it is used as the destination and
+    folder_name is ignored.
+
     Returns the web view link for the uploaded file, or None on failure.
     """
     if not GOOGLE_CLIENT_ID or not GOOGLE_CLIENT_SECRET:
         raise ValueError("Google Drive credentials are not configured.")
 
-    from googleapiclient.discovery import build
     from googleapiclient.http import MediaIoBaseUpload
 
-    creds = _get_credentials()
-    service = build("drive", "v3", credentials=creds)
-
-    folder_id = _find_or_create_folder(service, folder_name)
-
-    file_metadata = {
-        "name": filename,
-        "parents": [folder_id],
-    }
-
-    media = MediaIoBaseUpload(
-        io.BytesIO(csv_bytes),
-        mimetype="text/csv",
-        resumable=True,
-    )
-
-    uploaded = (
-        service.files()
-        .create(body=file_metadata, media_body=media, fields="id, webViewLink")
-        .execute()
-    )
-
-    # Make the file accessible to anyone with the link
-    service.permissions().create(
-        fileId=uploaded["id"],
-        body={"type": "anyone", "role": "reader"},
-    ).execute()
+    with _drive_lock:
+        service = _get_service()
+
+        folder_id = GOOGLE_DRIVE_FOLDER_ID or _find_or_create_folder(service, folder_name)
+
+        file_metadata = {
+            "name": filename,
+            "parents": [folder_id],
+        }
+
+        # Topic map CSVs are tiny, so a single multipart request is enough; a
+        # resumable upload would spend an extra round trip opening a session
+        media = MediaIoBaseUpload(
+            io.BytesIO(csv_bytes),
+            mimetype="text/csv",
+            resumable=False,
+        )
+
+        uploaded = (
+            service.files()
+            .create(body=file_metadata, media_body=media, fields="id, webViewLink")
+            .execute()
+        )
+
+        # Make the file accessible to anyone with the link
+        service.permissions().create(
+            fileId=uploaded["id"],
+            body={"type": "anyone", "role": "reader"},
+        ).execute()
 
     return uploaded.get("webViewLink")
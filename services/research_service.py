@@ -1,4 +1,9 @@
+import io
+import re
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Optional
 
@@ -7,12 +12,46 @@ from tavily import TavilyClient
 
 from config.settings import (
     TAVILY_API_KEY,
+    TAVILY_CONCURRENCY,
     TAVILY_MAX_RESULTS,
     TAVILY_RATE_LIMIT_DELAY,
     TAVILY_SEARCH_DEPTH,
 )
 
 
+_STAT_INDICATORS = ("%", "percent", "billion", "million", "thousand", "$")
+_CONTENT_TYPE_RE = re.compile(
+    r"\b(guide|how to|vs|comparison|review|best|checklist|faq)s?\b"
+)
+# Text since the previous sentence end or question mark, up to a question mark
+_QUESTION_RE = re.compile(r"([^.?]*)\?")
+
+
+def _add_unique(item: str, items: List[str], seen: set, limit: int) -> None:
+    """Record item in seen and append it to items if new and under limit."""
+    if item not in seen:
+        seen.add(item)
+        if len(items) < limit:
+            items.append(item)
+
+
+class _RateLimiter:
+    """Space out request starts across threads by a minimum interval."""
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+
 def build_research_queries(
     topic: str,
     industry: Optional[str] = None,
@@ -42,6 +81,12 @@ def build_research_queries(
     return queries
 
 
+@st.cache_resource(show_spinner=False)
+def _get_client() -> TavilyClient:
+    """Return a shared Tavily client, created once per process."""
+    return TavilyClient(api_key=TAVILY_API_KEY)
+
+
 @st.cache_data(show_spinner=False)
 def perform_research(
     topic: str,
@@ -56,122 +101,133 @@ def perform_research(
     if not TAVILY_API_KEY:
         raise ValueError("TAVILY_API_KEY is not configured.")
 
-    client = TavilyClient(api_key=TAVILY_API_KEY)
+    client = _get_client()
     queries = build_research_queries(topic, industry, competitors)
 
+    # Lists keep the first N unique items for the compiled document; the
+    # seen sets dedupe at insert time and give the unique totals
     all_answers = []
-    all_urls = []
-    all_snippets = []
-    all_questions = []
-    all_stats = []
+    all_urls, seen_urls = [], set()
+    all_snippets, seen_snippets = [], set()
+    all_questions, seen_questions = [], set()
+    all_stats, seen_stats = [], set()
     content_types_seen = []
 
     progress_bar = st.progress(0)
     status_text = st.empty()
-
-    for i, query in enumerate(queries):
-        status_text.text(f"Researching: {query}")
-        progress_bar.progress((i + 1) / len(queries))
-
-        try:
-            result = client.search(
-                query=query,
-                search_depth=TAVILY_SEARCH_DEPTH,
-                max_results=TAVILY_MAX_RESULTS,
-                include_answer=True,
-                include_raw_content=False,
-            )
-
-            if result.get("answer"):
-                all_answers.append(f"**Query: {query}**\n{result['answer']}")
-
-            for r in result.get("results", []):
-                url = r.get("url", "")
-                title = r.get("title", "")
-                snippet = r.get("content", "")
-
-                if url and title:
-                    all_urls.append(f"- [{title}]({url})")
-                if snippet:
-                    all_snippets.append(f"[{title}]: {snippet}")
-
-                # Detect questions in titles/snippets
-                for text in [title, snippet]:
-                    if text and "?" in text:
-                        sentences = text.split("?")
-                        for s in sentences[:-1]:
-                            q = s.strip().split(".")[-1].strip() + "?"
-                            if len(q) > 15 and len(q) < 200:
-                                all_questions.append(q)
-
-                # Detect statistics
-                if snippet:
-                    for indicator in ["%", "percent", "billion", "million", "thousand", "$"]:
-                        if indicator in snippet.lower():
-                            all_stats.append(snippet[:300])
-                            break
-
-                # Detect content types
-                title_lower = title.lower() if title else ""
-                for ct in ["guide", "how to", "vs", "comparison", "review", "best", "checklist", "faq"]:
-                    if ct in title_lower:
-                        content_types_seen.append(ct)
-
-        except Exception as e:
-            # Skip failed queries, continue with others
-            st.warning(f"Research query skipped: {query} ({e})")
-
-        if i < len(queries) - 1:
-            time.sleep(TAVILY_RATE_LIMIT_DELAY)
+    status_text.text(f"Researching {len(queries)} queries...")
+
+    limiter = _RateLimiter(TAVILY_RATE_LIMIT_DELAY)
+
+    def _run_query(query: str) -> dict:
+        limiter.wait()
+        return client.search(
+            query=query,
+            search_depth=TAVILY_SEARCH_DEPTH,
+            max_results=TAVILY_MAX_RESULTS,
+            include_answer=True,
+            include_raw_content=False,
+        )
+
+    # Queries run concurrently; Streamlit calls stay on this thread
+    results: List[Optional[dict]] = [None] * len(queries)
+    with ThreadPoolExecutor(max_workers=TAVILY_CONCURRENCY) as executor:
+        futures = {executor.submit(_run_query, q): i for i, q in enumerate(queries)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            status_text.text(f"Researched: {queries[i]}")
+            progress_bar.progress(done / len(queries))
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                # Skip failed queries, continue with others
+                st.warning(f"Research query skipped: {queries[i]} ({e})")
+
+    # Extract in query order so the compiled research is deterministic
+    for query, result in zip(queries, results):
+        if result is None:
+            continue
+
+        if result.get("answer"):
+            all_answers.append(f"**Query: {query}**\n{result['answer']}")
+
+        for r in result.get("results", []):
+            url = r.get("url", "")
+            title = r.get("title", "")
+            snippet = r.get("content", "")
+
+            if url and title:
+                _add_unique(f"- [{title}]({url})", all_urls, seen_urls, 30)
+            if snippet:
+                _add_unique(f"[{title}]: {snippet}", all_snippets, seen_snippets, 25)
+
+            # Detect questions in titles/snippets
+            for text in (title, snippet):
+                if text and "?" in text:
+                    for s in _QUESTION_RE.findall(text):
+                        q = s.strip() + "?"
+                        if len(q) > 15 and len(q) < 200:
+                            _add_unique(q, all_questions, seen_questions, 20)
+
+            # Detect statistics
+            if snippet:
+                snippet_lower = snippet.lower()
+                if any(indicator in snippet_lower for indicator in _STAT_INDICATORS):
+                    _add_unique(snippet[:300], all_stats, seen_stats, 15)
+
+            # Detect content types (each counted once per title)
+            if title:
+                content_types_seen.extend(
+                    dict.fromkeys(_CONTENT_TYPE_RE.findall(title.lower()))
+                )
 
     progress_bar.empty()
     status_text.empty()
 
-    # Compile into a structured research document
-    sections = []
+    # Compile into a structured research document, one line block at a time
+    buf = io.StringIO()
+
+    def _write(block: str) -> None:
+        if buf.tell():
+            buf.write("\n")
+        buf.write(block)
 
     if all_answers:
-        sections.append("### AI-Generated Research Summaries\n")
-        sections.append("\n\n".join(all_answers))
+        _write("### AI-Generated Research Summaries\n")
+        _write("\n\n".join(all_answers))
 
     if all_urls:
-        sections.append("\n### Top-Ranking URLs and Titles\n")
-        unique_urls = list(dict.fromkeys(all_urls))[:30]
-        sections.append("\n".join(unique_urls))
+        _write("\n### Top-Ranking URLs and Titles\n")
+        _write("\n".join(all_urls))
 
     if all_snippets:
-        sections.append("\n### Content Snippets from Search Results\n")
-        unique_snippets = list(dict.fromkeys(all_snippets))[:25]
-        sections.append("\n\n".join(unique_snippets))
+        _write("\n### Content Snippets from Search Results\n")
+        _write("\n\n".join(all_snippets))
 
     if all_stats:
-        sections.append("\n### Statistics and Data Points Found\n")
-        unique_stats = list(dict.fromkeys(all_stats))[:15]
-        for stat in unique_stats:
-            sections.append(f"- {stat}")
+        _write("\n### Statistics and Data Points Found\n")
+        for stat in all_stats:
+            _write(f"- {stat}")
 
     if all_questions:
-        sections.append("\n### Questions Identified in Results\n")
-        unique_questions = list(dict.fromkeys(all_questions))[:20]
-        for q in unique_questions:
-            sections.append(f"- {q}")
+        _write("\n### Questions Identified in Results\n")
+        for q in all_questions:
+            _write(f"- {q}")
 
     if content_types_seen:
-        sections.append("\n### Content Types Observed Ranking\n")
-        from collections import Counter
-        ct_counts = Counter(content_types_seen)
-        for ct, count in ct_counts.most_common():
-            sections.append(f"- {ct}: {count} occurrences")
+        _write("\n### Content Types Observed Ranking\n")
+        for ct, count in Counter(content_types_seen).most_common():
+            _write(f"- {ct}: {count} occurrences")
 
-    compiled_text = "\n".join(sections)
+    compiled_text = buf.getvalue()
 
     # Build a short summary
     summary_parts = [
         f"Executed {len(queries)} research queries for '{topic}'.",
-        f"Found {len(all_urls)} unique URLs,",
-        f"{len(all_snippets)} content snippets,",
-        f"{len(all_stats)} data points,",
-        f"and {len(all_questions)} questions.",
+        f"Found {len(seen_urls)} unique URLs,",
+        f"{len(seen_snippets)} content snippets,",
+        f"{len(seen_stats)} data points,",
+        f"and {len(seen_questions)} questions.",
     ]
     summary = " ".join(summary_parts)
 
@@ -179,8 +235,8 @@ def perform_research(
         "compiled_text": compiled_text,
         "summary": summary,
         "query_count": len(queries),
-        "url_count": len(set(all_urls)),
-        "snippet_count": len(all_snippets),
-        "stats_count": len(all_stats),
-        "questions_count": len(all_questions),
+        "url_count": len(seen_urls),
+        "snippet_count": len(seen_snippets),
+        "stats_count": len(seen_stats),
+        "questions_count": len(seen_questions),
     }
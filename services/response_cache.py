@@ -0,0 +1,63 @@
+import hashlib
+import sqlite3
+import time
+from typing import Optional
+
+from config.settings import (
+    CLAUDE_CACHE_DISABLED,
+    CLAUDE_CACHE_PATH,
+    CLAUDE_CACHE_TTL,
+)
+from services import cache_db
+
+
+def make_key(*parts) -> str:
+    """Build a cache key from the request parameters that affect the response."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS responses "
+    "(key TEXT PRIMARY KEY, response TEXT NOT NULL, ts INTEGER NOT NULL)"
+)
+
+
+def lookup(key: str) -> Optional[str]:
+    """Return the cached response for key, or None on miss, expiry, or error."""
+    if CLAUDE_CACHE_DISABLED:
+        return None
+    try:
+        conn = cache_db.connect(CLAUDE_CACHE_PATH, _SCHEMA)
+        try:
+            row = conn.execute(
+                "SELECT response, ts FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    if row is None or time.time() - row[1] > CLAUDE_CACHE_TTL:
+        return None
+    return row[0]
+
+
+def update(key: str, response: str) -> None:
+    """Store a response under key. Failures are ignored; caching is best-effort."""
+    if CLAUDE_CACHE_DISABLED:
+        return
+    try:
+        conn = cache_db.connect(CLAUDE_CACHE_PATH, _SCHEMA)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+                    (key, response, int(time.time())),
+                )
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError):
+        pass
@@ -0,0 +1,58 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from config.settings import RESULT_CACHE_DIR, RESULT_CACHE_DISABLED, RESULT_CACHE_TTL
+
+
+def _cache_path(inputs) -> Path:
+    """Return the cache file path for the generation-relevant user inputs."""
+    key_data = {
+        "topic": inputs.topic,
+        "scope": inputs.scope,
+        "industry": inputs.industry,
+        "audience": inputs.audience,
+        "geo_focus": inputs.geo_focus,
+        "competitors": inputs.competitors,
+        "existing_content": inputs.existing_content,
+    }
+    cache_key = hashlib.sha256(
+        json.dumps(key_data, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return Path(RESULT_CACHE_DIR) / f"{cache_key}.json"
+
+
+def load_cached_result(inputs) -> Optional[Tuple[dict, List[dict]]]:
+    """Load a previously generated (research, entries) pair for these inputs.
+
+    Returns None when disabled, if nothing is cached, if the entry is older
+    than RESULT_CACHE_TTL, or if the cache file is unreadable.
+    """
+    if RESULT_CACHE_DISABLED:
+        return None
+    path = _cache_path(inputs)
+    try:
+        if time.time() - path.stat().st_mtime > RESULT_CACHE_TTL:
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data["research"], data["entries"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cached_result(inputs, research: dict, entries: List[dict]) -> None:
+    """Persist a generated (research, entries) pair for these inputs."""
+    if RESULT_CACHE_DISABLED:
+        return
+    path = _cache_path(inputs)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"research": research, "entries": entries}),
+            encoding="utf-8",
+        )
+    except OSError:
+        # Caching is best-effort; a read-only filesystem shouldn't break generation
+        pass
@@ -0,0 +1,92 @@
+import json
+from typing import List, Optional
+
+import streamlit as st
+
+from config.settings import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_MODEL,
+    SEMANTIC_CACHE_PATH,
+    SEMANTIC_CACHE_THRESHOLD,
+)
+from services import cache_db
+
+
+@st.cache_resource(show_spinner=False)
+def _get_model():
+    """Load the sentence embedding model once per process."""
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(SEMANTIC_CACHE_MODEL)
+
+
+def _embed(text: str):
+    """Embed text as a normalized float32 row vector."""
+    return _get_model().encode(
+        [text], normalize_embeddings=True, convert_to_numpy=True
+    ).astype("float32")
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS topic_maps "
+    "(id INTEGER PRIMARY KEY, scope TEXT NOT NULL, "
+    "embedding BLOB NOT NULL, entries TEXT NOT NULL)"
+)
+
+
+def lookup(scope: str, query: str) -> Optional[List[dict]]:
+    """Return stored entries for the most similar cached inputs with the same scope.
+
+    Lets near-duplicate inputs (e.g. "AWS deploy guide" vs "deploying on AWS")
+    reuse a previously generated map. Returns None when disabled, on a miss
+    below the similarity threshold, or on any error (including missing
+    optional dependencies).
+    """
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    try:
+        import faiss
+        import numpy as np
+
+        conn = cache_db.connect(SEMANTIC_CACHE_PATH, _SCHEMA)
+        try:
+            rows = conn.execute(
+                "SELECT embedding, entries FROM topic_maps WHERE scope = ?", (scope,)
+            ).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return None
+
+        vectors = np.vstack(
+            [np.frombuffer(embedding, dtype="float32") for embedding, _ in rows]
+        )
+        index = faiss.IndexFlatIP(vectors.shape[1])
+        index.add(vectors)
+        scores, ids = index.search(_embed(query), 1)
+        if scores[0][0] < SEMANTIC_CACHE_THRESHOLD:
+            return None
+        return json.loads(rows[ids[0][0]][1])
+    except Exception:
+        # Missing optional dependencies, a model download failure or a
+        # corrupt row are all treated as a miss
+        return None
+
+
+def store(scope: str, query: str, entries: List[dict]) -> None:
+    """Store validated entries for these inputs. Failures are ignored."""
+    if not SEMANTIC_CACHE_ENABLED:
+        return
+    try:
+        vector = _embed(query)
+        conn = cache_db.connect(SEMANTIC_CACHE_PATH, _SCHEMA)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO topic_maps (scope, embedding, entries) VALUES (?, ?, ?)",
+                    (scope, vector.tobytes(), json.dumps(entries)),
+                )
+        finally:
+            conn.close()
+    except Exception:
+        pass